@@ -1,12 +1,106 @@
 """Document utilities for Azure Blob Storage operations and document processing."""
 
+import multiprocessing
 import os
+import threading
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+import fitz  # PyMuPDF
+from azure.core.exceptions import ResourceExistsError
 from azure.storage.blob import BlobServiceClient, ContainerClient
-from langchain_community.document_loaders import PyPDFLoader, UnstructuredFileLoader
+from langchain_community.document_loaders import UnstructuredFileLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from langchain_core.documents import Document
 
+try:
+    from semantic_text_splitter import TextSplitter as RustTextSplitter
+    RUST_SPLITTER_AVAILABLE = True
+except ImportError:
+    RUST_SPLITTER_AVAILABLE = False
+
+
+# Literal separators (no regex), coarsest first
+TEXT_SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+
+# Formats whose loader needs a real file on disk; everything else is loaded from memory
+PATH_ONLY_EXTENSIONS = (".docx",)
+
+# Pages are joined on the coarsest separator so page breaks stay preferred split points
+PAGE_SEPARATOR = TEXT_SEPARATORS[0]
+
+# Joined text at least this long is split in a worker process so chunking doesn't hold the GIL
+PROCESS_POOL_MIN_CHARS = 200_000
+
+_chunk_pool = None
+_chunk_pool_lock = threading.Lock()
+
+
+class _RustSplitterAdapter:
+    """Expose semantic-text-splitter through the split_text() interface used by DocumentProcessor."""
+    
+    def __init__(self, chunk_size: int, chunk_overlap: int):
+        # Capacity is measured in characters, matching RecursiveCharacterTextSplitter
+        self._splitter = RustTextSplitter(chunk_size, overlap=chunk_overlap)
+    
+    def split_text(self, text: str) -> List[str]:
+        return self._splitter.chunks(text)
+
+
+@lru_cache(maxsize=None)
+def get_text_splitter(chunk_size: int, chunk_overlap: int):
+    """
+    Return a shared text splitter for the given chunking parameters.
+    
+    Uses the Rust-backed semantic-text-splitter when installed, otherwise
+    LangChain's RecursiveCharacterTextSplitter.
+    
+    Args:
+        chunk_size: Size of text chunks
+        chunk_overlap: Overlap between chunks
+        
+    Returns:
+        Splitter exposing split_text(), reused across processors
+    """
+    if RUST_SPLITTER_AVAILABLE:
+        return _RustSplitterAdapter(chunk_size, chunk_overlap)
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=TEXT_SEPARATORS,
+        is_separator_regex=False,
+        # Keep sentence punctuation (". ") on the chunk it ends instead of starting the next one
+        keep_separator="end",
+    )
+
+
+def _get_chunk_pool() -> ProcessPoolExecutor:
+    """Return the shared chunking process pool, creating it on first use."""
+    global _chunk_pool
+    with _chunk_pool_lock:
+        if _chunk_pool is None:
+            # Forking a multithreaded server process is unsafe, so workers start fresh interpreters
+            _chunk_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+            )
+        return _chunk_pool
+
+
+def _discard_chunk_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken chunking pool so the next large document starts a fresh one."""
+    global _chunk_pool
+    with _chunk_pool_lock:
+        if _chunk_pool is pool:
+            _chunk_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _split_text_worker(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """Split text inside a pool worker; only plain strings cross the process boundary."""
+    return get_text_splitter(chunk_size, chunk_overlap).split_text(text)
+
 
 class AzureBlobDocumentManager:
     """Manage uploads, downloads, and listings against a single blob container."""
@@ -23,6 +117,22 @@ class AzureBlobDocumentManager:
         self.container_name = container_name
         self.container_client = self.blob_service.get_container_client(container_name)
     
+    def ensure_container(self) -> bool:
+        """
+        Create the container if it does not exist yet.
+        
+        Returns:
+            True if the container was created, False if it already existed
+        """
+        if self.container_client.exists():
+            return False
+        try:
+            self.container_client.create_container()
+        except ResourceExistsError:
+            # Created concurrently by another worker
+            return False
+        return True
+    
     def upload_file(self, file_name: str, file_content: bytes, overwrite: bool = True) -> dict:
         """
         Upload a file to Azure Blob Storage.
@@ -44,19 +154,26 @@ class AzureBlobDocumentManager:
             "size": len(file_content)
         }
     
-    def list_files(self) -> List[dict]:
+    def list_files(self, prefix: Optional[str] = None, max_results: Optional[int] = None) -> List[dict]:
         """
-        List all files in the blob container.
+        List files in the blob container.
         
+        Args:
+            prefix: Only include blobs whose name starts with this prefix
+            max_results: Return only the first page of at most this many blobs
+            
         Returns:
-            List of file metadata dictionaries
+            List of file metadata dictionaries (last_modified is left as a datetime)
         """
-        blobs = self.container_client.list_blobs()
+        blobs = self.container_client.list_blobs(name_starts_with=prefix, results_per_page=max_results)
+        if max_results is not None:
+            # Fetch a single page instead of walking the whole container
+            blobs = next(blobs.by_page(), [])
         return [
             {
                 "name": blob.name,
                 "size": blob.size,
-                "last_modified": blob.last_modified.isoformat() if blob.last_modified else None
+                "last_modified": blob.last_modified
             }
             for blob in blobs
         ]
@@ -75,6 +192,23 @@ class AzureBlobDocumentManager:
         download_stream = blob_client.download_blob()
         return download_stream.readall()
     
+    def download_to_file(self, file_name: str, local_path: str, max_concurrency: int = 8) -> int:
+        """
+        Stream a blob straight to a local file without buffering it in memory.
+        
+        Args:
+            file_name: Name of the file to download
+            local_path: Destination path on local disk
+            max_concurrency: Number of parallel ranged GETs used for large blobs
+            
+        Returns:
+            Number of bytes written
+        """
+        blob_client = self.container_client.get_blob_client(file_name)
+        download_stream = blob_client.download_blob(max_concurrency=max_concurrency)
+        with open(local_path, "wb") as f:
+            return download_stream.readinto(f)
+    
     def delete_file(self, file_name: str) -> bool:
         """
         Delete a file from Azure Blob Storage.
@@ -101,40 +235,65 @@ class DocumentProcessor:
             chunk_size: Size of text chunks
             chunk_overlap: Overlap between chunks
         """
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
-        )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.text_splitter = get_text_splitter(chunk_size, chunk_overlap)
     
-    def load_document(self, file_path: str, file_name: str) -> List[Document]:
+    def load_document(
+        self,
+        file_path: Optional[str],
+        file_name: str,
+        file_bytes: Optional[bytes] = None
+    ) -> List[Document]:
         """
         Load a document based on file extension.
         
+        Every returned Document carries ``source`` and ``page`` metadata.
+        
         Args:
-            file_path: Path to the file
+            file_path: Path to the file (required for .docx, ignored when file_bytes is given)
             file_name: Original file name (for extension detection)
+            file_bytes: File content already in memory, used instead of file_path
             
         Returns:
             List of Document objects
         """
         if file_name.endswith(".pdf"):
-            loader = PyPDFLoader(file_path)
-            return loader.load()
+            # PyMuPDF extracts text roughly an order of magnitude faster than pypdf
+            pdf = fitz.open(stream=file_bytes, filetype="pdf") if file_bytes is not None else fitz.open(file_path)
+            with pdf:
+                return [
+                    Document(page_content=page.get_text("text"), metadata={"source": file_name, "page": i})
+                    for i, page in enumerate(pdf)
+                ]
         elif file_name.endswith((".txt", ".md")):
             # Simple text loading for .txt and .md files
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            return [Document(page_content=content, metadata={"source": file_name})]
-        elif file_name.endswith(".docx"):
+            if file_bytes is not None:
+                # Same newline normalization as reading in text mode
+                content = file_bytes.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+            else:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    content = f.read()
+            return [Document(page_content=content, metadata={"source": file_name, "page": 0})]
+        elif file_name.endswith(PATH_ONLY_EXTENSIONS):
             # Use UnstructuredFileLoader only for .docx
             loader = UnstructuredFileLoader(file_path)
-            return loader.load()
+            documents = loader.load()
+            for i, doc in enumerate(documents):
+                doc.metadata["source"] = file_name
+                # Ensure page metadata exists (required by Azure AI Search index)
+                doc.metadata.setdefault("page", i)
+            return documents
         else:
             raise ValueError(f"Unsupported file type: {file_name}")
     
     def chunk_documents(self, documents: List[Document]) -> List[Document]:
         """
-        Split documents into chunks.
+        Split documents into chunks in a single pass.
+        
+        The documents are expected to be the pages of one file. Their text is
+        joined and split once; each chunk inherits the metadata of the page it
+        starts on.
         
         Args:
             documents: List of documents to chunk
@@ -142,7 +301,43 @@ class DocumentProcessor:
         Returns:
             List of chunked documents
         """
-        return self.text_splitter.split_documents(documents)
+        if not documents:
+            return []
+        
+        # Start offset of each page within the joined text
+        page_starts = []
+        offset = 0
+        for doc in documents:
+            page_starts.append(offset)
+            offset += len(doc.page_content) + len(PAGE_SEPARATOR)
+        text = PAGE_SEPARATOR.join(doc.page_content for doc in documents)
+        
+        pieces = None
+        if len(text) >= PROCESS_POOL_MIN_CHARS:
+            pool = _get_chunk_pool()
+            try:
+                pieces = pool.submit(_split_text_worker, text, self.chunk_size, self.chunk_overlap).result()
+            except BrokenProcessPool as e:
+                # A worker died (e.g. OOM); split this document in-process and rebuild the pool next time
+                print(f"Warning: Chunking process pool broke, splitting in-process: {e}")
+                _discard_chunk_pool(pool)
+        if pieces is None:
+            pieces = self.text_splitter.split_text(text)
+        
+        chunks = []
+        index = 0
+        previous_chunk_len = 0
+        for chunk in pieces:
+            # Chunks appear in order, each overlapping the previous one by at most chunk_overlap
+            found = text.find(chunk, max(0, index + previous_chunk_len - self.chunk_overlap))
+            if found != -1:
+                index = found
+            previous_chunk_len = len(chunk)
+            
+            page = documents[bisect_right(page_starts, index) - 1]
+            chunks.append(Document(page_content=chunk, metadata=dict(page.metadata)))
+        
+        return chunks
     
     def process_file(
         self, 
@@ -156,44 +351,35 @@ class DocumentProcessor:
         Args:
             blob_manager: Azure blob manager instance
             file_name: Name of the file to process
-            temp_dir: Temporary directory for downloads
+            temp_dir: Temporary directory for downloads that need a file on disk
             
         Returns:
             Tuple of (chunked documents, number of chunks)
         """
-        # Create temp directory if it doesn't exist
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        # Download file from blob storage
-        file_content = blob_manager.download_file(file_name)
-        
-        # Save temporarily to local disk
-        local_path = os.path.join(temp_dir, f"temp_{file_name}")
-        with open(local_path, "wb") as f:
-            f.write(file_content)
-        
-        try:
-            # Load document
-            documents = self.load_document(local_path, file_name)
-            print(f"[DEBUG] Loaded {len(documents)} raw documents from {file_name}")
-            
-            # Add source metadata and ensure page number exists
-            for i, doc in enumerate(documents):
-                doc.metadata["source"] = file_name
-                # Ensure page metadata exists (required by Azure AI Search index)
-                if "page" not in doc.metadata:
-                    doc.metadata["page"] = i
+        if not file_name.endswith(PATH_ONLY_EXTENSIONS):
+            # Load straight from memory, no temp file round-trip
+            documents = self.load_document(None, file_name, file_bytes=blob_manager.download_file(file_name))
+        else:
+            # Create temp directory if it doesn't exist
+            os.makedirs(temp_dir, exist_ok=True)
             
-            # Chunk documents
-            chunks = self.chunk_documents(documents)
-            print(f"[DEBUG] Created {len(chunks)} chunks from {file_name}")
+            # Stream file from blob storage to local disk
+            local_path = os.path.join(temp_dir, f"temp_{file_name}")
             
-            return chunks, len(chunks)
+            try:
+                blob_manager.download_to_file(file_name, local_path)
+                documents = self.load_document(local_path, file_name)
+            finally:
+                # Cleanup temporary file
+                if os.path.exists(local_path):
+                    os.remove(local_path)
+        print(f"[DEBUG] Loaded {len(documents)} raw documents from {file_name}")
+        
+        # Chunk documents
+        chunks = self.chunk_documents(documents)
+        print(f"[DEBUG] Created {len(chunks)} chunks from {file_name}")
         
-        finally:
-            # Cleanup temporary file
-            if os.path.exists(local_path):
-                os.remove(local_path)
+        return chunks, len(chunks)
 
 
 def create_blob_manager(connection_string: str, container_name: str) -> AzureBlobDocumentManager:
@@ -0,0 +1,201 @@
+"""Embedding client wrappers used by the RAG pipeline: query caching and request batching."""
+
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from openai import BadRequestError
+
+_WS_RE = re.compile(r"\s+")
+# Trailing characters that do not change what a query asks for
+_TERMINAL_PUNCTUATION = "?!.,;: "
+
+
+def normalize_query(text: str) -> str:
+    """Canonicalize a query for caching and embedding: lowercase, collapse whitespace, drop terminal punctuation."""
+    collapsed = _WS_RE.sub(" ", text).strip().lower()
+    # A query that is only punctuation keeps it rather than becoming an empty embedding input
+    return collapsed.rstrip(_TERMINAL_PUNCTUATION) or collapsed
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent single-query embeddings into one batched embeddings request."""
+
+    def __init__(self, embeddings: Embeddings, max_batch: int = 64, max_wait_ms: float = 10.0):
+        """
+        Initialize the embedding batcher.
+
+        Args:
+            embeddings: Underlying embeddings client
+            max_batch: Maximum number of queries sent in one request
+            max_wait_ms: How long the first queued query waits for others to join its batch
+        """
+        self.embeddings = embeddings
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+
+        # Bound to the event loop that first used the batcher; rebuilt if the loop changes
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Strong references to in-flight batch requests so they are not garbage collected
+        self._inflight: set = set()
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed a single query as part of the next batch."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run(self._queue))
+        future = loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Send without blocking collection of the next batch
+            task = loop.create_task(self._flush(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _flush(self, batch: list) -> None:
+        try:
+            vectors = await self.embeddings.aembed_documents([text for text, _ in batch])
+        except BadRequestError as e:
+            # One bad input (token overflow, content filter) must not fail the queries batched
+            # with it, so retry each on its own and only fail the ones that are rejected again
+            if len(batch) > 1:
+                await asyncio.gather(*(self._flush([item]) for item in batch))
+                return
+            self._fail(batch[0][1], e)
+            return
+        except Exception as e:
+            # Throttling, server errors and timeouts affect the whole batch; splitting would
+            # only multiply requests against an endpoint that is already struggling
+            for _, future in batch:
+                self._fail(future, e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    @staticmethod
+    def _fail(future: asyncio.Future, error: Exception) -> None:
+        if not future.done():
+            future.set_exception(error)
+
+
+class CachedEmbeddings(Embeddings):
+    """Wrap an embeddings client with a thread-safe LRU + TTL cache for query embeddings."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600.0,
+        batcher: Optional[EmbeddingBatcher] = None,
+    ):
+        """
+        Initialize the cached embeddings wrapper.
+
+        Args:
+            embeddings: Underlying embeddings client
+            max_entries: Maximum number of cached query vectors
+            ttl_seconds: Seconds a cached vector stays valid
+            batcher: Optional batcher that async cache misses are routed through
+        """
+        self.embeddings = embeddings
+        self.batcher = batcher
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        # sha256(normalize_query(text)) -> (expires_at, float32 vector)
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or time.monotonic() >= entry[0]:
+                if entry is not None:
+                    del self._cache[key]
+                self._misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self._hits += 1
+            return entry[1].tolist()
+
+    def _put(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            # float32 halves memory versus a list of Python floats
+            self._cache[key] = (time.monotonic() + self.ttl_seconds, np.asarray(vector, dtype=np.float32))
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, serving repeats from the cache."""
+        # Embed the normalized text so the cached vector matches every variant sharing its key
+        text = normalize_query(text)
+        key = self._key(text)
+        vector = self._get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self._put(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Async variant of embed_query()."""
+        text = normalize_query(text)
+        key = self._key(text)
+        vector = self._get(key)
+        if vector is None:
+            if self.batcher is not None:
+                vector = await self.batcher.embed(text)
+            else:
+                vector = await self.embeddings.aembed_query(text)
+            self._put(key, vector)
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents without caching (indexing rarely repeats texts)."""
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Async variant of embed_documents()."""
+        return await self.embeddings.aembed_documents(texts)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current cache size."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._cache),
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
@@ -1,13 +1,16 @@
+import asyncio
 import os
 import time
 import traceback
+from collections import OrderedDict
 from typing import List, Optional
 
 from fastapi import FastAPI, UploadFile, File, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
+from azure.core.exceptions import AzureError
 
 # Document utilities
 from document_utils import create_blob_manager, create_document_processor
@@ -15,7 +18,7 @@ from rag_pipeline import RAGPipeline
 
 load_dotenv()
 
-app = FastAPI(title="Agentic RAG Backend")
+app = FastAPI(title="Agentic RAG Backend", default_response_class=ORJSONResponse)
 
 # CORS - Allow both common frontend ports
 app.add_middleware(
@@ -35,9 +38,12 @@ AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 CHAT_DEPLOYMENT = os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT")
 EMBED_DEPLOYMENT = os.getenv("AZURE_OPENAI_EMBED_DEPLOYMENT")
+EMBED_DIMENSIONS = os.getenv("AZURE_OPENAI_EMBED_DIMENSIONS")
 
 BLOB_CONN = os.getenv("AZURE_BLOB_CONN_STRING")
 BLOB_CONTAINER = os.getenv("AZURE_BLOB_CONTAINER", "docs")
+# Scratch space for downloaded blobs; point at tmpfs (e.g. /dev/shm/documind) on Linux to skip disk I/O
+DOC_TEMP_DIR = os.getenv("DOC_TEMP_DIR", "temp")
 
 SEARCH_SERVICE = os.getenv("AZURE_SEARCH_SERVICE")
 SEARCH_INDEX = os.getenv("AZURE_SEARCH_INDEX")
@@ -71,9 +77,10 @@ if BLOB_CONN:
     
     # Ensure container exists
     try:
-        blob_manager.container_client.create_container()
-    except Exception:
-        pass  # Container already exists
+        if blob_manager.ensure_container():
+            print(f"✅ Created blob container: {BLOB_CONTAINER}")
+    except AzureError as e:
+        print(f"Warning: Could not verify blob container '{BLOB_CONTAINER}': {e}")
 else:
     print("Warning: Azure Blob Storage not configured. Upload functionality will not work.")
     blob_manager = None
@@ -91,45 +98,105 @@ if AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_API_KEY:
         search_index=SEARCH_INDEX,
         prompt_template=PROMPT_TEMPLATE,
         api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-08-01-preview"),
+        embedding_dimensions=int(EMBED_DIMENSIONS) if EMBED_DIMENSIONS else None,
+        semantic_cache_threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+        semantic_cache_ttl=float(os.getenv("SEMANTIC_CACHE_TTL", "3600")),
+        semantic_cache_size=int(os.getenv("SEMANTIC_CACHE_SIZE", "1000")),
+        emit_reasoning_log=os.getenv("EMIT_REASONING_LOG", "true").lower() == "true",
     )
-    rag_pipeline.get_vectorstore()
     print("✅ RAG system ready")
 else:
     print("Warning: Azure OpenAI not configured. Chat functionality will not work until you configure .env file.")
 
+# /files listing cache: (prefix, max) -> (monotonic timestamp, files), LRU-bounded since keys come from clients
+FILES_CACHE_TTL_SECONDS = 10.0
+FILES_CACHE_SIZE = 64
+_files_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+# Listing in progress per (generation, prefix, max), shared by concurrent requests for that key;
+# the generation keeps requests arriving after an upload from joining a listing started before it
+_files_inflight = {}
+# Bumped when uploads invalidate the cache so listings started earlier don't store stale results
+_files_cache_generation = 0
+
+# Files read into memory and uploaded at once, across all /upload requests
+UPLOAD_MAX_CONCURRENCY = 4
+_upload_semaphore = asyncio.Semaphore(UPLOAD_MAX_CONCURRENCY)
+
 class ChatRequest(BaseModel):
     query: str
-    top_k: Optional[int] = 5
+    top_k: int = Field(5, ge=1)
 
 @app.get("/health")
 def health():
     """Lightweight health probe for container orchestrators."""
-    return {"status": "ok"}
+    if rag_pipeline is None:
+        return {"status": "ok"}
+    return {"status": "ok", "embedding_cache": rag_pipeline.query_embeddings.stats()}
 
 @app.get("/files")
-def list_files():
-    """List all uploaded files in Blob Storage"""
+async def list_files(
+    prefix: Optional[str] = Query(None),
+    max_results: Optional[int] = Query(None, alias="max", ge=1),
+):
+    """List uploaded files in Blob Storage, cached briefly to absorb UI polling"""
+    key = (prefix, max_results)
     try:
-        files = blob_manager.list_files()
+        cached = _files_cache.get(key)
+        if cached and time.monotonic() - cached[0] < FILES_CACHE_TTL_SECONDS:
+            _files_cache.move_to_end(key)
+            files = cached[1]
+        else:
+            inflight_key = (_files_cache_generation, *key)
+            task = _files_inflight.get(inflight_key)
+            if task is None:
+                task = asyncio.create_task(_fetch_files(key, _files_cache_generation))
+                _files_inflight[inflight_key] = task
+                task.add_done_callback(lambda _: _files_inflight.pop(inflight_key, None))
+            # A disconnecting client must not cancel the listing other requests are waiting on
+            files = await asyncio.shield(task)
         return {"files": files, "count": len(files)}
     except Exception as e:
         return {"error": str(e), "files": [], "count": 0}
 
+async def _fetch_files(key: tuple, generation: int) -> list:
+    """List blobs for a (prefix, max) key and cache the result unless an upload happened meanwhile."""
+    files = await asyncio.to_thread(blob_manager.list_files, *key)
+    if generation == _files_cache_generation:
+        _files_cache[key] = (time.monotonic(), files)
+        _files_cache.move_to_end(key)
+        while len(_files_cache) > FILES_CACHE_SIZE:
+            _files_cache.popitem(last=False)
+    return files
+
 @app.post("/upload")
 async def upload_file(request: Request, files: List[UploadFile] = File(...)):
     """Upload one or more files to Blob Storage and return their metadata."""
-    uploaded_files = []
-    
-    for file in files:
-        data = await file.read()
-        
-        # Upload using blob manager
-        file_info = blob_manager.upload_file(file.filename, data)
-        uploaded_files.append({
+    global _files_cache_generation
+
+    async def _handle(file: UploadFile) -> dict:
+        # Bounds both the buffered payloads and the executor threads the uploads occupy
+        async with _upload_semaphore:
+            data = await file.read()
+            
+            # Upload using blob manager (blocking SDK call, run off the event loop)
+            file_info = await asyncio.to_thread(blob_manager.upload_file, file.filename, data)
+        return {
             "name": file_info["name"],
             "location": "blob",
             "path": file_info["name"]
-        })
+        }
+    
+    try:
+        # Let every upload finish before invalidating, so blobs still in flight aren't missed
+        results = await asyncio.gather(*[_handle(f) for f in files], return_exceptions=True)
+    finally:
+        # New blobs must show up on the next /files call, even if some other file failed
+        _files_cache_generation += 1
+        _files_cache.clear()
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    uploaded_files = results
     
     return {"files": uploaded_files, "message": f"Uploaded {len(uploaded_files)} file(s)"}
 
@@ -141,7 +208,7 @@ def process_blob(request: Request, blob: str = Query(...)):
         
         # Process file using document processor
         print(f"[PROCESS] Loading and chunking {blob}...")
-        chunks, chunk_count = doc_processor.process_file(blob_manager, blob)
+        chunks, chunk_count = doc_processor.process_file(blob_manager, blob, temp_dir=DOC_TEMP_DIR)
         print(f"[PROCESS] Created {chunk_count} chunks")
         
         if chunk_count == 0:
@@ -155,8 +222,7 @@ def process_blob(request: Request, blob: str = Query(...)):
 
         # Index into Azure AI Search
         print(f"[PROCESS] Indexing {chunk_count} chunks into Azure AI Search...")
-        vectorstore = rag_pipeline.get_vectorstore()
-        vectorstore.add_documents(chunks)
+        rag_pipeline.index_documents(chunks)
         print(f"[PROCESS] ✓ Successfully indexed {chunk_count} chunks for {blob}\n")
 
         return {
@@ -174,9 +240,14 @@ def process_blob(request: Request, blob: str = Query(...)):
         return {"error": str(e), "blob": blob, "chunks": 0}
 
 @app.post("/chat")
-def chat(req: ChatRequest):
+async def chat(req: ChatRequest):
     """Answer a question using RAG over the indexed documents."""
-    return rag_pipeline.chat(req.query, req.top_k)
+    return await rag_pipeline.achat(req.query, req.top_k)
+
+@app.get("/chat/grounding/{grounding_id}")
+async def chat_grounding(grounding_id: str):
+    """Return the background Azure AI grounding evaluation for a /chat answer."""
+    return rag_pipeline.get_grounding_result(grounding_id)
 
 # Streaming endpoint (LLM-only streaming of final synthesis text)
 @app.post("/chat/stream")
@@ -0,0 +1,163 @@
+"""In-process semantic cache that maps query embeddings to previously generated chat responses."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+# Optional (pip install "hnswlib>=0.7"): worth it for caches far larger than the default 1000
+# entries; hnswlib stores float32, so it gives up the flat scan's float16 memory saving
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+# HNSW graph parameters: links per node, build-time and query-time candidate list sizes
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Rows upcast from float16 to float32 at a time during the similarity scan
+SCAN_BLOCK_ROWS = 1024
+
+
+class SemanticCache:
+    """LRU + TTL cache of responses, looked up by cosine similarity between query embeddings."""
+
+    def __init__(self, threshold: float = 0.95, ttl_seconds: float = 3600.0, max_entries: int = 1000):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a cached entry to count as a hit
+            ttl_seconds: Seconds an entry stays valid after insertion
+            max_entries: Maximum number of entries before the least recently used is evicted
+        """
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._lock = threading.RLock()
+        # Slot -> (expires_at, value); insertion/hit order doubles as LRU order
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        # Unit-normalized float16 vectors, one row per slot (half the memory of float32; the
+        # precision loss is far below the gap between a hit and a miss at typical thresholds)
+        self._vectors: Optional[np.ndarray] = None
+        # Per-slot tag (e.g. top_k); -1 marks a free slot
+        self._tags = np.full(max_entries, -1, dtype=np.int64)
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        # Approximate nearest-neighbour index labelled by slot, used instead of the flat
+        # float16 scan when hnswlib is installed (built on first insert, once dim is known)
+        self._index = None
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def lookup(self, vector: Sequence[float], tag: int = 0) -> Optional[Any]:
+        """
+        Return the cached value for the most similar query, if it is similar enough.
+
+        Args:
+            vector: Query embedding
+            tag: Only entries inserted with the same tag can match
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        with self._lock:
+            slot = self._match(self._normalize(vector), tag)
+            if slot is None:
+                return None
+
+            expires_at, value = self._entries[slot]
+            if time.monotonic() >= expires_at:
+                self._evict(slot)
+                return None
+            self._entries.move_to_end(slot)
+            return value
+
+    def insert(self, vector: Sequence[float], value: Any, tag: int = 0) -> None:
+        """
+        Store a value under a query embedding, evicting the least recently used entry if full.
+
+        Args:
+            vector: Query embedding
+            value: Value to return on later hits
+            tag: Tag that lookups must match
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            q = self._normalize(vector)
+            if self._index is None and self._vectors is None:
+                self._allocate(q.shape[0])
+            # Concurrent misses for the same question would otherwise each add a duplicate,
+            # so an existing match is overwritten in place
+            slot = self._match(q, tag)
+            if slot is None:
+                if not self._free_slots:
+                    self._evict(next(iter(self._entries)))
+                slot = self._free_slots.pop()
+            if self._index is not None:
+                # Re-adding a label (live or deleted) overwrites its vector and makes it live
+                self._index.add_items(q[np.newaxis, :], [slot])
+            else:
+                self._vectors[slot] = q
+            self._tags[slot] = tag
+            self._entries[slot] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(slot)
+
+    def _match(self, q: np.ndarray, tag: int) -> Optional[int]:
+        """Slot of the most similar live entry with this tag, if it reaches the threshold."""
+        if not self._entries:
+            return None
+        if self._index is not None:
+            try:
+                labels, distances = self._index.knn_query(q, k=1, filter=lambda label: self._tags[label] == tag)
+            except RuntimeError:
+                # No live entry with this tag
+                return None
+            slot, score = int(labels[0][0]), 1.0 - float(distances[0][0])
+        else:
+            scores = self._scores(q)
+            scores[self._tags != tag] = -np.inf
+            slot = int(np.argmax(scores))
+            score = scores[slot]
+        return slot if score >= self.threshold else None
+
+    def _allocate(self, dim: int) -> None:
+        if HNSWLIB_AVAILABLE:
+            self._index = hnswlib.Index(space="ip", dim=dim)
+            self._index.init_index(max_elements=self.max_entries, M=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION)
+            self._index.set_ef(HNSW_EF_SEARCH)
+            # Calls are already serialized by the cache lock
+            self._index.set_num_threads(1)
+        else:
+            self._vectors = np.zeros((self.max_entries, dim), dtype=np.float16)
+
+    def _scores(self, q: np.ndarray) -> np.ndarray:
+        # NumPy has no BLAS kernel for float16, so upcast a block at a time and use float32 matmul
+        scores = np.empty(self._vectors.shape[0], dtype=np.float32)
+        for start in range(0, self._vectors.shape[0], SCAN_BLOCK_ROWS):
+            block = self._vectors[start:start + SCAN_BLOCK_ROWS]
+            scores[start:start + block.shape[0]] = block.astype(np.float32) @ q
+        return scores
+
+    def clear(self) -> None:
+        """Drop every entry (e.g. after new documents are indexed)."""
+        with self._lock:
+            for slot in list(self._entries):
+                self._evict(slot)
+
+    def _evict(self, slot: int) -> None:
+        del self._entries[slot]
+        self._tags[slot] = -1
+        if self._index is not None:
+            self._index.mark_deleted(slot)
+        self._free_slots.append(slot)
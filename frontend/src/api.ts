@@ -22,6 +22,11 @@ export async function chat(query: string, top_k = 5) {
   return res.data
 }
 
+export async function chatGrounding(groundingId: string) {
+  const res = await axios.get(`${BASE}/chat/grounding/${groundingId}`)
+  return res.data
+}
+
 export async function chatStream(query: string, top_k = 5) {
   const res = await fetch(`${BASE}/chat/stream`, {
     method: 'POST',
@@ -1,12 +1,13 @@
 import React, { useState } from 'react'
 import ReactMarkdown from 'react-markdown'
-import { chatStream, chat } from '../api'
+import { chatStream, chat, chatGrounding } from '../api'
 
 type Turn = {
   role: 'user' | 'assistant'
   text: string
   sources?: { source: string; snippet: string }[]
   agentic?: boolean
+  grounding_id?: string
   reasoning_log?: Array<{ phase: string; details: string; duration: string }>
 }
 
@@ -134,8 +135,10 @@ export default function ChatStream() {
         text: result.answer,
         sources: result.sources,
         agentic: result.agentic,
+        grounding_id: result.grounding_id,
         reasoning_log: result.reasoning_log
       }])
+      if (result.grounding_id) pollGrounding(result.grounding_id)
     } catch (error) {
       console.error('Chat error:', error)
       setTurns(prev => [...prev, {
@@ -149,6 +152,23 @@ export default function ChatStream() {
     }
   }
 
+  // Azure AI grounding evaluation finishes after the answer is shown; update the badge when it lands
+  async function pollGrounding(groundingId: string) {
+    for (let attempt = 0; attempt < 30; attempt++) {
+      await new Promise(resolve => setTimeout(resolve, 1000))
+      try {
+        const res = await chatGrounding(groundingId)
+        if (res.status === 'pending') continue
+        if (res.status === 'done') {
+          setTurns(prev => prev.map(t => t.grounding_id === groundingId ? { ...t, agentic: res.agentic } : t))
+        }
+      } catch (error) {
+        console.error('Grounding poll error:', error)
+      }
+      return
+    }
+  }
+
   const handlePromptClick = (prompt: string) => {
     setQ(prompt)
   }